@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Compares running many small scripts with one ill.py invocation each, as a
+shell loop would, with running them all in a single batch mode invocation.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ILL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill', 'ill.py')
+
+SCRIPT = """
+(fn fib (n) (if (<= n 2) 1 (+ (fib (- n 1)) (fib (- n 2)))))
+(let v [])
+(let i 0)
+(while (< i 200) (do (push v (* i {i})) (let i (+ i 1))))
+(print (fib 12) (len (set v)))
+"""
+
+def timed(command) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i in range(count):
+            paths.append(os.path.join(tmp_dir, f"script{i}.jasp"))
+            with open(paths[-1], 'w') as f:
+                f.write(SCRIPT.format(i=i))
+        start = time.perf_counter()
+        for path in paths:
+            subprocess.run([sys.executable, ILL, path], check=True, stdout=subprocess.DEVNULL)
+        print(f"{count} scripts, one invocation each: {time.perf_counter() - start:.2f}s")
+        for jobs in sorted({1, os.cpu_count() or 1}):
+            seconds = timed([sys.executable, ILL, '--jobs', str(jobs)] + paths)
+            print(f"{count} scripts, batch mode with {jobs} jobs: {seconds:.2f}s")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Compares evaluating a prelude of function definitions and lookup tables with
+restoring the global environment it produces from an image.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+import image
+from interpreter import Interpreter
+
+def make_prelude(functions: int=400, table_size: int=3000) -> str:
+    lines = [f"(fn f{i} (x) (if (< x {i}) (+ x {i}) (do (let y (* x 2)) (- y {i}))))"
+            for i in range(functions)]
+    lines.append("(let table [])")
+    lines.append("(let i 0)")
+    lines.append(f"(while (< i {table_size}) (do (push table [i (* i i)]) (let i (+ i 1))))")
+    lines.append('(let config {"a": [1 2 {"b": table}] "names": #{"x" "y"}})')
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    prelude = make_prelude()
+    start = time.perf_counter()
+    interp = Interpreter()
+    interp.eval(prelude)
+    print(f"evaluate prelude: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    fd, path = tempfile.mkstemp(suffix='.img')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        image.save_image(interp.global_env, path)
+        print(f"save image: {(time.perf_counter() - start) * 1000:.1f} ms ({os.path.getsize(path) / 1024:.0f} KB)")
+        start = time.perf_counter()
+        restored = Interpreter()
+        image.load_image(restored.global_env, path)
+        print(f"restore image: {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert restored.eval("(f399 500)") == interp.eval("(f399 500)")
+    finally:
+        os.remove(path)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Compares carrying a library inline in every script with importing it, where
+the module's AST is either parsed, read from the on-disk cache (as in a new
+process) or taken from the in-memory cache (as in the same process).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+import module
+from interpreter import Interpreter
+
+FUNCTIONS = 1000
+
+def timed(label: str, source: str, base_dir: str, clear_memory_cache: bool):
+    if clear_memory_cache:
+        module._ast_cache.clear()
+    interp = Interpreter()
+    interp.loader.base_dir = base_dir
+    start = time.perf_counter()
+    assert interp.eval(source) == 42
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return interp
+
+if __name__ == "__main__":
+    library = "\n".join(f"(fn f{i} (x) (if (< x {i}) (+ x {i}) (- x {i})))" for i in range(FUNCTIONS))
+    main = '(f41 1)'
+    tmp = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(tmp, 'lib.jasp'), 'w') as f:
+            f.write(library)
+        timed("inline library", library + "\n" + main, tmp, True)
+        timed("import, parsed", '(import "lib.jasp") ' + main, tmp, True)
+        timed("import, disk cache", '(import "lib.jasp") ' + main, tmp, True)
+        interp = timed("import, memory cache", '(import "lib.jasp") ' + main, tmp, False)
+        print(interp.loader.report())
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compares reaching vector elements and map values with an each scan, the only
+way before the collection builtins, with nth and get.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+from interpreter import Interpreter
+
+SCAN = """
+(fn scan-nth (v i)
+    (do (let out [])
+        (let j 0)
+        (each (v x)
+            (do (if (= j i) (push out x))
+                (let j (+ j 1))))
+        (nth out 0)))
+(fn scan-get (m key)
+    (do (let out [])
+        (each (m k v) (if (= k key) (push out v)))
+        (nth out 0)))
+(let i 0)
+(let sum 0)
+(while (< i accesses)
+    (do (let sum (+ sum (scan-nth v (- n (+ i 1))) (scan-get m i)))
+        (let i (+ i 1))))
+sum
+"""
+
+BUILTINS = """
+(let i 0)
+(let sum 0)
+(while (< i accesses)
+    (do (let sum (+ sum (nth v (- n (+ i 1))) (get m i)))
+        (let i (+ i 1))))
+sum
+"""
+
+if __name__ == "__main__":
+    accesses = 20
+    for n in (1000, 10000, 30000):
+        variables = {'n': n, 'accesses': accesses, 'v': list(range(n)), 'm': {i: i for i in range(n)}}
+        expected = sum(n - (i + 1) + i for i in range(accesses))
+        for label, source in (('each scan', SCAN), ('nth/get', BUILTINS)):
+            program = Interpreter().compile(source)
+            start = time.perf_counter()
+            assert program.run(variables) == expected
+            print(f"{label:<9} n={n:<6} {accesses} accesses: {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Builds a 10 MB string with (let s (+ s piece)) in a loop, with and without
+ropes.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+import interpreter
+from interpreter import Interpreter
+
+SOURCE = """
+(let s "")
+(let i 0)
+(while (< i n)
+    (do (let s (+ s piece))
+        (let i (+ i 1))))
+s
+"""
+
+PIECE = 'x' * 100
+
+if __name__ == "__main__":
+    program = Interpreter().compile(SOURCE)
+    # Pass --ropes-only to skip the (slow, quadratic) plain string runs.
+    thresholds = [('ropes', interpreter.ROPE_THRESHOLD)]
+    if '--ropes-only' not in sys.argv:
+        thresholds.append(('plain strings', float('inf')))
+    default = interpreter.ROPE_THRESHOLD
+    for label, threshold in thresholds:
+        interpreter.ROPE_THRESHOLD = threshold
+        for n in (25000, 50000, 100000):
+            start = time.perf_counter()
+            s = program.run({'n': n, 'piece': PIECE})
+            assert len(s) == n * len(PIECE)
+            print(f"{label}: {len(s) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+    interpreter.ROPE_THRESHOLD = default
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Deduplicates a collection and joins (intersects) two collections with the set
+builtins, at 10^6 elements, and with nested each loops, which are quadratic
+and so only run at small sizes.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+from interpreter import Interpreter
+
+SETS = """
+(let unique (set a))
+(let common (intersection unique (set b)))
+[(len unique) (len common)]
+"""
+
+# Without sets, membership is an each loop with =. A let in an each body is
+# local to it, so matches are recorded by pushing onto a vector.
+EACH_LOOPS = """
+(let unique [])
+(each (a x)
+    (do (let hits [])
+        (each (unique y) (if (= x y) (push hits y)))
+        (if (= (len hits) 0) (push unique x))))
+(let common [])
+(each (unique x)
+    (do (let hits [])
+        (each (b y) (if (= x y) (push hits y)))
+        (if (> (len hits) 0) (push common x))))
+[(len unique) (len common)]
+"""
+
+def collections(n: int):
+    rng = random.Random(n)
+    # Values repeat about twice in each collection and half of them are in both.
+    return ([rng.randrange(n // 2) for _ in range(n)],
+            [rng.randrange(n // 4, 3 * n // 4) for _ in range(n)])
+
+def bench(label: str, source: str, n: int):
+    a, b = collections(n)
+    expected = [len(set(a)), len(set(a) & set(b))]
+    program = Interpreter().compile(source)
+    start = time.perf_counter()
+    assert program.run({'a': a, 'b': b}) == expected
+    print(f"{label:<9} n={n:<8} {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    for n in (1000, 10**6):
+        bench('sets', SETS, n)
+    for n in (250, 500, 1000):
+        bench('each', EACH_LOOPS, n)
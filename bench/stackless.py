@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Checks that the stackless evaluator agrees with the recursive one, over
+test.jasp and programs exercising the builtins, then compares their speed and
+times parsing deeply nested special forms.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'ill'))
+import tokenizer
+import parser
+from interpreter import Interpreter, format_error
+
+PARITY_PROGRAMS = [
+    '(+ 1 (* 2 3))',
+    '(fn fib (n) (if (<= n 2) 1 (+ (fib (- n 1)) (fib (- n 2))))) (fib 15)',
+    '(let i 0) (let acc []) (while (< i 5) (do (push acc i) (let i (+ i 1)))) acc',
+    '(let m {"a": 1 "b": [1 {2: 3}]}) (let out []) (each (m k v) (push out k)) [out m]',
+    '(if false 1)',
+    '((fn anon (a) (+ 2 a)) 5)',
+    # Strings and ropes.
+    '(let s "") (let i 0) (while (< i 300) (do (let s (+ s "ab")) (let i (+ i 1)))) [(len s) (str s)]',
+    '(let b (str-builder "x")) (let i 0) (while (< i 3) (do (let b (str-append b (str i))) (let i (+ i 1)))) (str b)',
+    '(str-join ", " ["a" "b" (str 1)])',
+    # Collections.
+    '(let v [5 3 9 1]) [(nth v 2) (len v) (slice v 1 3) (sort v) (get {"a": 1} "b" 0) (has-key {"a": 1} "a")]',
+    '(let m {"a": [1 2] "b": #{3}}) (let out []) (each (m k v) (push out (len v))) [(get m "a") out]',
+    # Sets.
+    '(let a #{1 2 3}) (let b (set [2 3 4])) [(union a b) (intersection a b) (difference a b) (contains? a 2)]',
+    '(let v [1 2 2 3 1]) (let seen #{}) (let i 0) (while (< i (len v)) (do (let seen (union seen #{(nth v i)})) (let i (+ i 1)))) seen',
+    # Errors must be the same too.
+    '(nth [1 2] 5)',
+    '(get {"a": 1} "b")',
+    '(undefined-fn 1)',
+]
+
+def run(source: str, stackless: bool, base_dir: str=None):
+    """Returns what source printed and evaluated to (or the error it raised)."""
+    interp = Interpreter(stackless=stackless)
+    interp.loader.base_dir = base_dir
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            result = repr(interp.eval(source))
+        except Exception as e:
+            result = format_error(e)
+    return output.getvalue(), result
+
+def check_parity():
+    with open(os.path.join(ROOT, 'test.jasp'), 'r') as f:
+        programs = [f.read()] + PARITY_PROGRAMS
+    for source in programs:
+        recursive = run(source, False, ROOT)
+        stackless = run(source, True, ROOT)
+        if recursive != stackless:
+            sys.exit(f"evaluators disagree on {source[:60]!r}:\n  recursive: {recursive}\n  stackless: {stackless}")
+    print(f"parity: {len(programs)} programs agree")
+
+def bench(label: str, source: str):
+    for stackless in (False, True):
+        start = time.perf_counter()
+        try:
+            Interpreter(stackless=stackless).eval(source)
+            result = f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        except RecursionError:
+            result = "RecursionError"
+        print(f"{label:<24} {'stackless' if stackless else 'recursive':<9} {result}")
+
+if __name__ == "__main__":
+    check_parity()
+    bench("fib 22", '(fn fib (n) (if (<= n 2) 1 (+ (fib (- n 1)) (fib (- n 2))))) (fib 22)')
+    bench("while 100k", '(let i 0) (while (< i 100000) (let i (+ i 1)))')
+    for n in (1000, 2000, 4000):
+        # Tail recursion is quadratic: each call adds an Env that lookups walk.
+        bench(f"tail recursion {n}", f'(fn loop (n) (if (= n 0) 0 (loop (- n 1)))) (loop {n})')
+    for depth in (1000, 10000, 100000):
+        tokens = tokenizer.tokenize("(if true " * depth + "1" + ")" * depth)
+        start = time.perf_counter()
+        parser.parse(tokens)
+        print(f"parse {depth} nested ifs: {(time.perf_counter() - start) * 1000:.1f} ms")
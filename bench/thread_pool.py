@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Runs one compiled program many times from a thread pool, with increasing
+numbers of workers, to measure the throughput of isolated Interpreter runs.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+from interpreter import Interpreter
+
+SOURCE = """
+(let i 0)
+(let acc 0)
+(while (< i n)
+    (do (let acc (+ acc (sq i)))
+        (let i (+ i 1))))
+acc
+"""
+
+RUNS = 32
+N = 2000
+
+if __name__ == "__main__":
+    interp = Interpreter()
+    interp.eval("(fn sq (x) (* x x))")
+    program = interp.compile(SOURCE)
+    for workers in (1, 2, 4):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            results = set(pool.map(lambda n: program.run({'n': n}), [N] * RUNS))
+        assert len(results) == 1, results
+        print(f"{workers} workers: {RUNS} runs in {time.perf_counter() - start:.2f}s")
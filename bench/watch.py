@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compares rerunning a long script from scratch with watch mode rerunning it
+after an edit to its last form, and to a function definition in its middle.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ill'))
+import watch
+from interpreter import Interpreter
+
+FUNCTIONS = 1000
+
+def make_script(middle: int, last: int) -> str:
+    lines = [f"(fn f{i} (x) (if (< x {i}) (+ x {i}) (- x {i})))" for i in range(FUNCTIONS)]
+    lines[FUNCTIONS // 2] = f"(fn f{FUNCTIONS // 2} (x) (+ x {middle}))"
+    lines.append("(let table [])")
+    lines.append("(let i 0)")
+    lines.append("(while (< i 50000) (do (push table [i (* i i)]) (let i (+ i 1))))")
+    lines.append(f"(print (f{FUNCTIONS // 2} 0) (+ (len table) {last}))")
+    return "\n".join(lines)
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        fn()
+    print(f"{label:<22} {(time.perf_counter() - start) * 1000:>8.1f} ms")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'script.jasp')
+        def write(middle, last):
+            with open(path, 'w') as f:
+                f.write(make_script(middle, last))
+
+        write(0, 0)
+        timed("full run", lambda: Interpreter().eval(make_script(0, 0)))
+        watcher = watch.Watcher(path)
+        timed("watch: initial run", watcher.update)
+        write(0, 1)
+        timed("watch: edit last form", watcher.update)
+        write(1, 1)
+        timed("watch: edit middle", watcher.update)
+        print(f"{len(watcher.snapshots)} snapshots for {len(watcher.forms)} forms")
@@ -0,0 +1,76 @@
+from typing import List
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+from script import run_file, OK, RUNTIME_ERROR
+from interpreter import format_error
+
+class Result:
+    """The outcome of running a single script in batch mode."""
+    def __init__(self, path: str, exit_code: int, output: str, seconds: float):
+        self.path = path
+        self.exit_code = exit_code
+        self.output = output
+        self.seconds = seconds
+
+def read_manifest(path: str) -> List[str]:
+    """
+    Returns the script paths listed in a manifest file, one per line. Paths
+    are relative to the manifest and blank lines and lines starting with ;
+    are ignored.
+    """
+    base_dir = os.path.dirname(path)
+    with open(path, 'r') as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base_dir, line) for line in lines if line and not line.startswith(';')]
+
+def run_script(path: str, image_path: str=None, stackless: bool=False) -> Result:
+    """
+    Runs the script at path in a fresh interpreter, capturing everything it
+    prints. Errors are reported in the result rather than raised, so that no
+    script can take down the worker pool.
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            exit_code = run_file(path, image_path, stackless)
+        except Exception as e:
+            # E.g. a MemoryError while parsing a huge script.
+            print("ERROR:", format_error(e))
+            exit_code = RUNTIME_ERROR
+    return Result(path, exit_code, output.getvalue(), time.perf_counter() - start)
+
+def run_batch(paths: List[str], jobs: int=None, image_path: str=None, stackless: bool=False) -> int:
+    """
+    Runs the scripts on a pool of `jobs` worker processes (by default one per
+    CPU) which are reused across scripts, so interpreter startup, imports and
+    the builtins are only paid for once per worker. The output of each script
+    is printed to stdout once it's done, in order, and a per-script timing
+    summary to stderr.
+
+    Returns the highest exit code of any script, i.e. 0 if all succeeded.
+    """
+    start = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(jobs) as pool:
+        args = [(path, image_path, stackless) for path in paths]
+        for result in pool.imap(run_script_star, args):
+            print(f"==> {result.path} <==")
+            sys.stdout.write(result.output)
+            sys.stdout.flush()
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r.exit_code != OK]
+    for r in results:
+        print(f"{r.exit_code:>4} {r.seconds * 1000:>10.1f} ms  {r.path}", file=sys.stderr)
+    print(f"{len(results)} scripts, {len(failed)} failed, {elapsed:.2f}s "
+          f"wall, {sum(r.seconds for r in results):.2f}s total", file=sys.stderr)
+    return max((r.exit_code for r in results), default=OK)
+
+def run_script_star(args) -> Result:
+    return run_script(*args)
@@ -1,22 +1,29 @@
 class Env:
-    def __init__(self, sym_table={}, parent=None):
-        self.sym_table = sym_table
+    def __init__(self, sym_table=None, parent=None):
+        # Each environment must own its symbol table, otherwise all
+        # environments created without one would silently share a single dict.
+        self.sym_table = sym_table if sym_table is not None else {}
         self.parent = parent
 
     def define(self, identifier: str, value):
         cpy = value
         self.sym_table[identifier] = cpy
 
+    # Since functions are called in their caller's environment, the chain of
+    # parents is as long as the call stack, so it's walked iteratively.
+
     def __getitem__(self, identifier: str):
-        if identifier in self.sym_table:
-            return self.sym_table[identifier]
-        elif self.parent:
-            return self.parent[identifier]
+        env = self
+        while env:
+            if identifier in env.sym_table:
+                return env.sym_table[identifier]
+            env = env.parent
         raise LookupError(f"undefined symbol: {identifier}")
 
     def __contains__(self, identifier: str) -> bool:
-        if identifier in self.sym_table:
-            return True
-        elif self.parent:
-            return identifier in self.parent
+        env = self
+        while env:
+            if identifier in env.sym_table:
+                return True
+            env = env.parent
         return False
@@ -1,5 +1,9 @@
 from typing import List, Dict
 
+# Version of the AST format, i.e. of the classes below. Parsed ASTs cached on
+# disk are keyed by it, so it must be bumped whenever they change.
+AST_VERSION = 1
+
 class Expr:
     "Abstract base for all expressions."
     def __init__(self, line: int, col: int):
@@ -36,6 +40,14 @@ class MapExpr(CollectionExpr):
     def __repr__(self) -> str:
         return f"Map({self.expr_dict})"
 
+class SetExpr(CollectionExpr):
+    def __init__(self, exprs: List[Expr], line: int=None, col: int=None):
+        super().__init__(line, col)
+        self.exprs = exprs
+
+    def __repr__(self) -> str:
+        return f"Set({self.exprs})"
+
 class LetExpr(Expr):
     def __init__(self, name: str, value: Expr, line: int=None, col: int=None):
         super().__init__(line, col)
@@ -106,3 +118,11 @@ class FnCallExpr(Expr):
 
     def __repr__(self) -> str:
         return f"FnCall(fn: {self.fn} args: {self.args})"
+
+class ImportExpr(Expr):
+    def __init__(self, path: str, line: int=None, col: int=None):
+        super().__init__(line, col)
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"Import({self.path})"
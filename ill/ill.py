@@ -1,31 +1,54 @@
 #!/usr/bin/env python3
 
-import tokenizer
-import parser
-import interpreter
+import script
+import batch
+import watch
+import argparse
 import sys
 
 if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Run ILL source files.")
+    argparser.add_argument('files', nargs='*', metavar='file', help="ILL source file")
+    argparser.add_argument('--manifest', metavar='FILE',
+            help="also run the files listed in FILE, one per line")
+    argparser.add_argument('--jobs', type=int, metavar='N',
+            help="run the files in batch mode on N worker processes (default: one per CPU)")
+    argparser.add_argument('--import-time', action='store_true',
+            help="report the time spent importing each module to stderr")
+    argparser.add_argument('--image', metavar='IMAGE',
+            help="restore the global environment from IMAGE before running the file")
+    argparser.add_argument('--save-image', metavar='IMAGE',
+            help="save the global environment to IMAGE after running the file")
+    argparser.add_argument('--watch', action='store_true',
+            help="rerun the file whenever it changes, from the first changed top-level form")
+    argparser.add_argument('--stackless', action='store_true',
+            help="use the stackless evaluator, which isn't limited by Python's recursion limit")
+    args = argparser.parse_args()
+    files = args.files + (batch.read_manifest(args.manifest) if args.manifest else [])
+    if not files:
+        argparser.error("need a file")
+    if args.watch:
+        if len(files) > 1 or args.manifest or args.jobs or args.save_image:
+            argparser.error("--watch only works with a single file")
+        try:
+            watch.Watcher(files[0], args.image, args.stackless).watch()
+        except script.ScriptError as e:
+            print("ERROR:", e)
+            sys.exit(e.exit_code)
+        except KeyboardInterrupt:
+            print()
+            sys.exit(0)
+    if len(files) > 1 or args.manifest or args.jobs:
+        # Batch mode: each file is run in its own interpreter.
+        if args.import_time or args.save_image:
+            argparser.error("--import-time and --save-image only work with a single file")
+        try:
+            sys.exit(batch.run_batch(files, args.jobs, args.image, args.stackless))
+        except KeyboardInterrupt:
+            print()
+            sys.exit(130)
     try:
-        if len(sys.argv) < 2:
-            print("need a file")
-            sys.exit(-1)
-        with open(sys.argv[1], 'r') as f:
-            s = f.read()
-            try:
-                tokens = tokenizer.tokenize(s)
-            except TypeError as e:
-                print("ERROR:", e)
-                sys.exit(1)
-            try:
-                ast = parser.parse(tokens)
-            except (TypeError,SyntaxError) as e:
-                print("ERROR:", e)
-                sys.exit(2)
-            interpreter.interpret(ast)
-            try:
-                pass
-            except Exception as e:
-                print("ERROR:", e)
-    except (KeyboardInterrupt, EOFError):
+        sys.exit(script.run_file(files[0], args.image, args.stackless, args.save_image, args.import_time))
+    except KeyboardInterrupt:
         print()
+        sys.exit(130)
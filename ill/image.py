@@ -0,0 +1,107 @@
+import os
+import pickle
+import tempfile
+from env import Env
+from interpreter import LOADER, BUILTIN_NAMES
+
+# Identifies an image file and the version of its format.
+MAGIC = b'ILLIMG\x01\n'
+
+class ImageError(Exception): pass
+
+# Bookkeeping entries of a global environment which are not program state.
+RESERVED_NAMES = (LOADER, BUILTIN_NAMES)
+
+def builtins_of(env: Env) -> dict:
+    """
+    Returns the canonical builtins of the global environment env by name.
+    Builtins (and host functions injected into an interpreter) are not stored
+    in images but are referenced by name and looked up among the builtins of
+    the environment being restored.
+    """
+    return env.sym_table.get(BUILTIN_NAMES, {})
+
+def program_symbols(env: Env) -> dict:
+    """
+    Returns the variables of the global environment env which are the state
+    of the program run in it: all but its bookkeeping entries and the names
+    bound to their own builtin.
+    """
+    builtins = builtins_of(env)
+    return {name: value for name, value in env.sym_table.items()
+            if name not in RESERVED_NAMES
+            and not (name in builtins and builtins[name] is value)}
+
+class ImagePickler(pickle.Pickler):
+    def __init__(self, file, env: Env):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.env = env
+        # A builtin may be bound to several canonical names, any of which
+        # restores it.
+        self.builtins = {}
+        for name, value in builtins_of(env).items():
+            self.builtins.setdefault(id(value), name)
+
+    def persistent_id(self, obj):
+        if obj is self.env:
+            return 'env'
+        name = self.builtins.get(id(obj))
+        if name is not None:
+            return ('builtin', name)
+        return None
+
+class ImageUnpickler(pickle.Unpickler):
+    def __init__(self, file, env: Env):
+        super().__init__(file)
+        self.env = env
+
+    def persistent_load(self, pid):
+        if pid == 'env':
+            return self.env
+        _, name = pid
+        builtins = builtins_of(self.env)
+        if name not in builtins:
+            raise ImageError(f"image refers to undefined builtin: {name}")
+        return builtins[name]
+
+def save_image(env: Env, path: str):
+    """
+    Saves a snapshot of the global environment `env` to the file at `path`:
+    every variable, function (including its AST) and loaded module defined in
+    it, but not the builtins. Other names bound to builtins (e.g. after
+    (let lt <)) are saved as references to the builtin. Raises ImageError if
+    the environment can't be saved.
+    """
+    symbols = program_symbols(env)
+    modules = env[LOADER].modules if LOADER in env.sym_table else {}
+    # The image is written to a temporary file which then replaces path, so
+    # that failing to save it never leaves a truncated image behind.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            ImagePickler(f, env).dump((symbols, modules))
+        os.replace(tmp_path, path)
+    except BaseException as e:
+        os.remove(tmp_path)
+        # E.g. data nested too deeply to be pickled, or a host object that
+        # can't be pickled.
+        if isinstance(e, (pickle.PicklingError, RecursionError, TypeError, AttributeError)):
+            raise ImageError(f"can't save image {path}: {e}") from e
+        raise
+
+def load_image(env: Env, path: str):
+    """
+    Restores the snapshot in the image file at `path` into the global
+    environment `env`, which must define the builtins the image refers to.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ImageError(f"{path} is not an ILL image or was made by an incompatible version")
+        try:
+            symbols, modules = ImageUnpickler(f, env).load()
+        except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+            raise ImageError(f"corrupt image {path}: {e}")
+    env.sym_table.update(symbols)
+    if LOADER in env.sym_table:
+        env[LOADER].modules.update(modules)
@@ -1,13 +1,26 @@
-from typing import List
+from typing import List, Dict, Callable
+import functools
 from expr import *
 from env import Env
+from rope import Rope, flatten, flatten_all
+from module import ModuleLoader
+import parser
 
 # Builtins
 ###############################################################################
 
+# Concatenating strings whose combined length reaches this many characters
+# produces a Rope instead of a new str.
+ROPE_THRESHOLD = 256
+
 def add(*args):
     r = args[0]
     for n in args[1:]:
+        if isinstance(r, str) and isinstance(n, (str, Rope)) \
+                and len(r) + len(n) >= ROPE_THRESHOLD:
+            # Building a string in a loop would otherwise copy the whole string
+            # on every iteration.
+            r = Rope(r)
         r += n
     return r
 
@@ -54,9 +67,175 @@ def do(*args):
     """
     return args[-1]
 
+def to_str(*args) -> str:
+    """Converts and concatenates its arguments into a single flat string."""
+    return ''.join(str(a) for a in args)
+
+def str_join(sep, coll) -> str:
+    """(str-join sep coll) joins the elements of coll separated by sep."""
+    return str(sep).join(str(elem) for elem in coll)
+
+def str_builder(*pieces) -> Rope:
+    """(str-builder pieces...) returns a new string builder (a rope)."""
+    return str_append(Rope(), *pieces)
+
+def str_append(builder, *pieces) -> Rope:
+    """
+    (str-append builder pieces...) returns a builder with pieces appended to
+    it, without copying the string built so far.
+    """
+    if not isinstance(builder, Rope):
+        builder = Rope(flatten(builder))
+    for piece in pieces:
+        builder = builder.append(piece)
+    return builder
+
+# Collection builtins map directly onto the operations of the underlying Python
+# list (vector) and dict (map).
+
+def type_name(value) -> str:
+    """Returns the ILL name of the type of value."""
+    if isinstance(value, list):
+        return 'vector'
+    elif isinstance(value, dict):
+        return 'map'
+    elif isinstance(value, frozenset):
+        return 'set'
+    elif isinstance(value, (str, Rope)):
+        return 'string'
+    elif isinstance(value, bool):
+        return 'bool'
+    elif isinstance(value, (int, float)):
+        return 'number'
+    elif isinstance(value, Function) or callable(value):
+        return 'function'
+    return type(value).__name__
+
+def _len(coll) -> int:
+    """(len coll) returns the number of elements in a vector, map, set or string."""
+    if not isinstance(coll, (list, dict, frozenset, str, Rope)):
+        raise TypeError(f"len expects a vector, map, set or string, got {type_name(coll)}")
+    return len(coll)
+
+def nth(coll, index):
+    """(nth coll index) returns the element at index in a vector or string."""
+    if not isinstance(coll, (list, str, Rope)):
+        raise TypeError(f"nth expects a vector or string, got {type_name(coll)}")
+    if not isinstance(index, int) or isinstance(index, bool):
+        raise TypeError(f"index must be a number, got {type_name(index)}")
+    if not -len(coll) <= index < len(coll):
+        raise IndexError(f"index {index} out of range for {type_name(coll)} of length {len(coll)}")
+    return coll[index]
+
+NO_DEFAULT = object()
+
+def get(coll, key, default=NO_DEFAULT):
+    """
+    (get map key [default]) returns the value of key in a map or, if coll is a
+    vector or string, the element at index key. If the key doesn't exist,
+    default is returned if given, otherwise it's an error.
+    """
+    if isinstance(coll, dict):
+        if key in coll:
+            return coll[key]
+        elif default is not NO_DEFAULT:
+            return default
+        raise LookupError(f"key not found: {key!r}")
+    elif default is not NO_DEFAULT and isinstance(coll, (list, str, Rope)) \
+            and isinstance(key, int) and not -len(coll) <= key < len(coll):
+        return default
+    return nth(coll, key)
+
+def has_key(coll, key) -> bool:
+    """(has-key map key) returns whether the map contains key."""
+    if not isinstance(coll, dict):
+        raise TypeError(f"has-key expects a map, got {type_name(coll)}")
+    return key in coll
+
+def _slice(coll, start, end=None):
+    """
+    (slice coll start [end]) returns a new vector (or string) of the elements
+    from index start up to, but not including, index end (or the end of coll).
+    """
+    if not isinstance(coll, (list, str, Rope)):
+        raise TypeError(f"slice expects a vector or string, got {type_name(coll)}")
+    return flatten(coll)[start:end]
+
+def push(coll, *elems) -> list:
+    """
+    (push vector elems...) appends elems to the end of vector, modifying it in
+    place, and returns it.
+    """
+    if not isinstance(coll, list):
+        raise TypeError(f"push expects a vector, got {type_name(coll)}")
+    coll.extend(elems)
+    return coll
+
+def sort(coll) -> list:
+    """(sort coll) returns a new vector with the elements of coll in order."""
+    if not isinstance(coll, (list, dict, frozenset)):
+        raise TypeError(f"sort expects a vector, map or set, got {type_name(coll)}")
+    try:
+        return sorted(coll)
+    except TypeError:
+        raise TypeError("sort expects elements that can be compared with each other")
+
+# Sets are frozensets so that they can be elements of other sets and map keys.
+
+def make_set(elems) -> frozenset:
+    try:
+        return frozenset(elems)
+    except TypeError:
+        raise TypeError("vectors and maps can't be set elements")
+
+def _set(coll) -> frozenset:
+    """(set coll) returns a set of the elements of a vector or set, or the keys of a map."""
+    if not isinstance(coll, (list, dict, frozenset)):
+        raise TypeError(f"set expects a vector, map or set, got {type_name(coll)}")
+    return make_set(coll)
+
+def contains(coll, elem) -> bool:
+    """
+    (contains? coll elem) returns whether elem is in coll: an element of a set
+    or vector, a key of a map or a substring of a string. This is a hash lookup
+    for sets and maps but a linear scan for vectors.
+    """
+    if isinstance(coll, (frozenset, dict)):
+        try:
+            return elem in coll
+        except TypeError:
+            # Vectors and maps are not hashable, so they can't be in a set.
+            return False
+    elif isinstance(coll, (list, str, Rope)):
+        return flatten(elem) in coll
+    raise TypeError(f"contains? expects a set, map, vector or string, got {type_name(coll)}")
+
+def set_operands(op: str, colls):
+    if not colls:
+        raise TypeError(f"{op} expects at least one set")
+    for coll in colls:
+        if not isinstance(coll, frozenset):
+            raise TypeError(f"{op} expects sets, got {type_name(coll)}")
+    return colls
+
+def union(*colls) -> frozenset:
+    """(union sets...) returns the elements that are in any of the sets."""
+    first, *rest = set_operands('union', colls)
+    return first.union(*rest)
+
+def intersection(*colls) -> frozenset:
+    """(intersection sets...) returns the elements that are in all of the sets."""
+    first, *rest = set_operands('intersection', colls)
+    return first.intersection(*rest)
+
+def difference(*colls) -> frozenset:
+    """(difference set sets...) returns the elements of set that are in none of the other sets."""
+    first, *rest = set_operands('difference', colls)
+    return first.difference(*rest)
+
 ###############################################################################
 
-global_env = Env({
+BUILTINS = {
     '+': add,
     '-': sub,
     '*': mul,
@@ -71,14 +250,60 @@ global_env = Env({
     'or': _or,
     'print': print,
     'do': do,
-})
+    'str': to_str,
+    'str-join': str_join,
+    'str-builder': str_builder,
+    'str-append': str_append,
+    'len': _len,
+    'nth': nth,
+    'get': get,
+    'has-key': has_key,
+    'slice': _slice,
+    'push': push,
+    'sort': sort,
+    'set': _set,
+    'contains?': contains,
+    'union': union,
+    'intersection': intersection,
+    'difference': difference,
+}
+
+# The module loader of an environment tree is stored in its global environment
+# under this name, which can't clash with an identifier.
+LOADER = '%loader'
+# Likewise, the canonical builtins of a global environment (BUILTINS and any
+# host functions injected into an Interpreter) are kept by name under this one,
+# so that they can be told apart from other variables bound to them.
+BUILTIN_NAMES = '%builtins'
+
+def make_global_env(base_dir: str=None, evaluate: Callable=None) -> Env:
+    """
+    Creates a new global environment with the builtins and a module loader
+    which runs modules with `evaluate` (interpret_expr by default).
+    """
+    env = Env(dict(BUILTINS))
+    run = functools.partial(interpret_module, evaluate=evaluate)
+    env.define(LOADER, ModuleLoader(env, run=run, base_dir=base_dir))
+    env.define(BUILTIN_NAMES, dict(BUILTINS))
+    return env
+
+def interpret_module(ast: List[Expr], env: Env, evaluate: Callable=None):
+    evaluate = evaluate or interpret_expr
+    for expr in ast:
+        evaluate(expr, env)
+
+global_env = make_global_env()
 
 ###############################################################################
 
-def interpret(ast: List[Expr]):
-    """Interprets the AST which is a list of expressions."""
+def interpret(ast: List[Expr], stackless: bool=False):
+    """
+    Interprets the AST which is a list of expressions. If stackless is set, it
+    is evaluated with evaluate_stackless rather than interpret_expr.
+    """
+    evaluate = evaluate_stackless if stackless else interpret_expr
     for expr in ast:
-        interpret_expr(expr, global_env)
+        evaluate(expr, global_env)
 
 def interpret_expr(expr: Expr, env: Env=global_env):
     # print('[i] curr expr:', expr)
@@ -88,6 +313,8 @@ def interpret_expr(expr: Expr, env: Env=global_env):
         return interpret_vector(expr, env)
     elif isinstance(expr, MapExpr):
         return interpret_map(expr, env)
+    elif isinstance(expr, SetExpr):
+        return interpret_set(expr, env)
     elif isinstance(expr, LetExpr):
         return interpret_let(expr, env)
     elif isinstance(expr, RefExpr):
@@ -102,6 +329,8 @@ def interpret_expr(expr: Expr, env: Env=global_env):
         return interpret_fn_def(expr, env)
     elif isinstance(expr, FnCallExpr):
         return interpret_fn_call(expr, env)
+    elif isinstance(expr, ImportExpr):
+        return interpret_import(expr, env)
     else:
         raise TypeError("unknown type")
 
@@ -135,19 +364,27 @@ def interpret_while(expr: WhileExpr, env: Env):
 def interpret_each(expr: EachExpr, env: Env):
     ret = None
     each_env = Env(sym_table={expr.elem_name: None}, parent=env)
-    coll = interpret_expr(expr.coll)
-    if isinstance(coll, list):
+    coll = interpret_expr(expr.coll, env)
+    for _ in bind_each(expr, coll, each_env):
+        ret = interpret_expr(expr.body, each_env)
+    return ret
+
+def bind_each(expr: EachExpr, coll, each_env: Env):
+    """
+    Binds the elements of coll (or the keys and values if it's a map) to the
+    names in the each expression header, one by one, yielding after each.
+    """
+    if isinstance(coll, (list, frozenset)):
         for elem in coll:
             each_env.define(expr.elem_name, elem)
-            ret = interpret_expr(expr.body, each_env)
+            yield
     else:
         assert isinstance(coll, dict)
+        key_name, val_name = expr.elem_name
         for key, val in coll.items():
-            key_name, val_name = expr.elem_name
             each_env.define(key_name, key)
             each_env.define(val_name, val)
-            ret = interpret_expr(expr.body, each_env)
-    return ret
+            yield
 
 def interpret_let(expr: LetExpr, env: Env):
     """Variable binding: (let name expr)"""
@@ -160,17 +397,24 @@ class Function:
         self.params = params
         self.body = body
 
+    def __deepcopy__(self, memo):
+        # Functions are never modified once defined, so copies can share them.
+        return self
+
     def __call__(self, parent_env: Env, *args):
+        # Evaluate the function body.
+        return interpret_expr(self.body, self.bind(parent_env, args))
+
+    def bind(self, parent_env: Env, args) -> Env:
+        """Returns the environment in which to evaluate a call's body."""
         if len(self.params) != len(args):
-            raise SyntaxError("function {self.name} expects {len(self.params)} arguments but {len(args)} given")
+            raise SyntaxError(f"function {self.name} expects {len(self.params)} arguments but {len(args)} given")
         # Populate the function environment with the function arguments so that
         # they're available when evaluating the function body.
         # NOTE: it is crucial that the environment (or at least its symbol
         # table) be reacreated from scratch as otherwise we're going to pollute
         # the entire callstack of the function if it's invoked recursively.
-        env = Env(sym_table={name: arg for name, arg in zip(self.params, args)}, parent=parent_env)
-        # Evaluate the function body.
-        return interpret_expr(self.body, env)
+        return Env(sym_table={name: arg for name, arg in zip(self.params, args)}, parent=parent_env)
 
 def interpret_fn_def(expr: FnDefExpr, env: Env):
     """Function definition: (fn identifier (params...) expr)"""
@@ -190,10 +434,352 @@ def interpret_fn_call(expr: FnCallExpr, env: Env):
     if isinstance(fn, Function):
         return fn(env, *args)
     else:
+        return call_builtin(fn, args, expr)
+
+def call_builtin(fn, args, expr: FnCallExpr):
+    """
+    Calls a builtin (Python) function. Errors raised by the builtin propagate
+    unchanged, but with the position of the call in the source recorded on
+    them (see note_position).
+    """
+    try:
         return fn(*args)
+    except (TypeError, ValueError, LookupError, ZeroDivisionError) as e:
+        note_position(e, expr)
+        raise
+
+def note_position(e: Exception, expr: Expr):
+    """
+    Records on the error e that it was raised while evaluating expr. The
+    positions are kept in e.ill_positions, innermost first, and are shown by
+    format_error.
+    """
+    e.ill_positions = getattr(e, 'ill_positions', []) + [f"line {expr.line} column {expr.col}"]
+
+def format_error(e: Exception) -> str:
+    """
+    Formats an error raised while running ILL code as a one line message,
+    prefixed with the source positions recorded on it.
+    """
+    positions = getattr(e, 'ill_positions', [])
+    return f"{type(e).__name__}: " + "".join(f"{pos}: " for pos in positions) + str(e)
+
+def interpret_import(expr: ImportExpr, env: Env):
+    """
+    Module import: (import "path")
+
+    The module is loaded and run once, in its own environment, and its
+    top-level definitions are then bound in the importing environment. Since
+    the module is shared by every run of every program of an interpreter,
+    each import binds its own copies of the module's vectors and maps.
+    """
+    module = env[LOADER].load(expr.path)
+    # The definitions are copied together so that vectors and maps shared
+    # between them stay shared.
+    for name, value in copy_value(module.env.sym_table).items():
+        env.define(name, value)
+    return module
+
+def copy_value(value):
+    """
+    Returns a deep copy of the vectors and maps in value. Everything else
+    (strings, sets, functions, etc) is immutable and so shared rather than
+    copied. The copy is made without recursing, so value may be nested
+    arbitrarily deep.
+    """
+    if not isinstance(value, (list, dict)):
+        return value
+    # The original and copy of each vector and map, by id of the original.
+    copies = {}
+    stack = [value]
+    while stack:
+        coll = stack.pop()
+        if id(coll) in copies:
+            continue
+        copies[id(coll)] = (coll, [] if isinstance(coll, list) else {})
+        for elem in (coll if isinstance(coll, list) else coll.values()):
+            if isinstance(elem, (list, dict)) and id(elem) not in copies:
+                stack.append(elem)
+    def copy_of(elem):
+        return copies[id(elem)][1] if isinstance(elem, (list, dict)) else elem
+    for coll, new in copies.values():
+        if isinstance(coll, list):
+            new.extend(copy_of(elem) for elem in coll)
+        else:
+            new.update((key, copy_of(val)) for key, val in coll.items())
+    return copies[id(value)][1]
 
 def interpret_vector(expr: VectorExpr, env: Env) -> list:
     return [interpret_expr(expr, env) for expr in expr.exprs]
 
 def interpret_map(expr: MapExpr, env: Env) -> dict:
     return {interpret_expr(key, env):interpret_expr(val, env) for key, val in expr.expr_dict.items()}
+
+def interpret_set(expr: SetExpr, env: Env) -> frozenset:
+    return set_literal([interpret_expr(elem, env) for elem in expr.exprs], expr)
+
+def set_literal(elems: list, expr: SetExpr) -> frozenset:
+    try:
+        return make_set(elems)
+    except TypeError as e:
+        note_position(e, expr)
+        raise
+
+# Stackless evaluator
+###############################################################################
+
+# Kinds of continuation frames. A frame is a tuple whose first element is its
+# kind and which records what to do with the value of the expression that is
+# being evaluated on top of it.
+K_IF = 0          # (K_IF, if_expr, env)
+K_WHILE_COND = 1  # (K_WHILE_COND, while_expr, env, last_body_value)
+K_WHILE_BODY = 2  # (K_WHILE_BODY, while_expr, env)
+K_EACH_COLL = 3   # (K_EACH_COLL, each_expr, env)
+K_EACH_BODY = 4   # (K_EACH_BODY, each_expr, each_env, bindings)
+K_LET = 5         # (K_LET, let_expr, env)
+K_CALL = 6        # (K_CALL, call_expr, env, values)
+K_VECTOR = 7      # (K_VECTOR, exprs, env, values)
+K_MAP = 8         # (K_MAP, keys_and_values, env, values)
+K_SET = 9         # (K_SET, set_expr, env, values)
+
+def evaluate_stackless(expr: Expr, env: Env=global_env):
+    """
+    Evaluates expr like interpret_expr but without recursing in Python: the
+    continuation of the expression currently being evaluated is kept in an
+    explicit stack of frames (CEK machine style), so nesting depth, including
+    that of non-tail recursive ILL functions, is only limited by memory.
+    Calls in tail position don't grow the stack, but like any other call they
+    still add an Env to the (dynamically scoped) environment chain, so deep
+    recursion gets quadratically slower as lookups walk that chain.
+
+    Only nested evaluation is stackless: a builtin calling back into ILL is
+    still evaluated by interpret_expr. Imported modules are run with the
+    evaluator of the Interpreter importing them.
+    """
+    stack = []
+    while True:
+        # Evaluate expr until it either produces a value or, if it has
+        # subexpressions, pushes a frame and continues with the first one.
+        t = type(expr)
+        if t is AtomExpr:
+            value = expr.value
+        elif t is RefExpr:
+            value = env[expr.name]
+        elif t is FnCallExpr:
+            stack.append((K_CALL, expr, env, []))
+            expr = expr.fn
+            continue
+        elif t is IfExpr:
+            stack.append((K_IF, expr, env))
+            expr = expr.cond
+            continue
+        elif t is LetExpr:
+            stack.append((K_LET, expr, env))
+            expr = expr.value
+            continue
+        elif t is WhileExpr:
+            stack.append((K_WHILE_COND, expr, env, None))
+            expr = expr.cond
+            continue
+        elif t is EachExpr:
+            stack.append((K_EACH_COLL, expr, env))
+            expr = expr.coll
+            continue
+        elif t is VectorExpr:
+            if not expr.exprs:
+                value = []
+            else:
+                stack.append((K_VECTOR, expr.exprs, env, []))
+                expr = expr.exprs[0]
+                continue
+        elif t is SetExpr:
+            if not expr.exprs:
+                value = frozenset()
+            else:
+                stack.append((K_SET, expr, env, []))
+                expr = expr.exprs[0]
+                continue
+        elif t is MapExpr:
+            if not expr.expr_dict:
+                value = {}
+            else:
+                keys_and_values = [e for item in expr.expr_dict.items() for e in item]
+                stack.append((K_MAP, keys_and_values, env, []))
+                expr = keys_and_values[0]
+                continue
+        elif t is FnDefExpr:
+            value = interpret_fn_def(expr, env)
+        elif t is ImportExpr:
+            value = interpret_import(expr, env)
+        else:
+            raise TypeError("unknown type")
+
+        # Pass the value to the frames on the stack until one of them needs
+        # another expression evaluated.
+        while stack:
+            frame = stack.pop()
+            kind = frame[0]
+            if kind == K_CALL:
+                _, call, env, values = frame
+                values.append(value)
+                if len(values) <= len(call.args):
+                    stack.append(frame)
+                    expr = call.args[len(values) - 1]
+                    break
+                fn = values[0]
+                assert callable(fn)
+                if isinstance(fn, Function):
+                    # The body replaces the call, so tail calls run in constant
+                    # stack space.
+                    env = fn.bind(env, values[1:])
+                    expr = fn.body
+                    break
+                value = call_builtin(fn, values[1:], call)
+            elif kind == K_IF:
+                _, if_expr, env = frame
+                if value:
+                    expr = if_expr.true_branch
+                    break
+                elif if_expr.false_branch:
+                    expr = if_expr.false_branch
+                    break
+                value = None
+            elif kind == K_LET:
+                _, let, env = frame
+                env.define(let.name, value)
+            elif kind == K_WHILE_COND:
+                _, loop, env, ret = frame
+                if not isinstance(value, bool):
+                    raise TypeError("loop condition must evaluate to a boolean value")
+                if value:
+                    stack.append((K_WHILE_BODY, loop, env))
+                    expr = loop.body
+                    break
+                value = ret
+            elif kind == K_WHILE_BODY:
+                _, loop, env = frame
+                stack.append((K_WHILE_COND, loop, env, value))
+                expr = loop.cond
+                break
+            elif kind == K_EACH_COLL or kind == K_EACH_BODY:
+                if kind == K_EACH_COLL:
+                    _, each, env = frame
+                    env = Env(sym_table={each.elem_name: None}, parent=env)
+                    bindings = bind_each(each, value, env)
+                    value = None
+                else:
+                    _, each, env, bindings = frame
+                # bind_each yields None for each element it binds.
+                if next(bindings, False) is None:
+                    stack.append((K_EACH_BODY, each, env, bindings))
+                    expr = each.body
+                    break
+            elif kind == K_VECTOR:
+                _, exprs, env, values = frame
+                values.append(value)
+                if len(values) < len(exprs):
+                    stack.append(frame)
+                    expr = exprs[len(values)]
+                    break
+                value = values
+            elif kind == K_SET:
+                _, set_expr, env, values = frame
+                values.append(value)
+                if len(values) < len(set_expr.exprs):
+                    stack.append(frame)
+                    expr = set_expr.exprs[len(values)]
+                    break
+                value = set_literal(values, set_expr)
+            else:
+                assert kind == K_MAP
+                _, keys_and_values, env, values = frame
+                values.append(value)
+                if len(values) < len(keys_and_values):
+                    stack.append(frame)
+                    expr = keys_and_values[len(values)]
+                    break
+                value = dict(zip(values[::2], values[1::2]))
+        else:
+            return value
+
+###############################################################################
+
+def host_function(fn: Callable) -> Callable:
+    """
+    Wraps a host Python function so that the ropes in its arguments, which
+    are internal to ILL, are flattened to strs before it's called.
+    """
+    @functools.wraps(fn)
+    def call(*args):
+        return fn(*(flatten_all(arg) for arg in args))
+    return call
+
+class Program:
+    """
+    A parsed ILL program bound to the Interpreter that compiled it. The AST is
+    never mutated during evaluation, so the same program may be run any number
+    of times, including concurrently from several threads.
+    """
+    def __init__(self, interpreter: 'Interpreter', ast: List[Expr]):
+        self.interpreter = interpreter
+        self.ast = ast
+
+    def run(self, bindings: Dict[str, object]=None):
+        """
+        Runs the program in a fresh environment that inherits the builtins and
+        definitions of the interpreter's global environment. `bindings` are
+        made available to the program as variables. Returns the value of the
+        last top-level expression, with any ropes in it flattened to strs.
+        """
+        env = Env(dict(bindings or {}), parent=self.interpreter.global_env)
+        ret = None
+        for expr in self.ast:
+            ret = self.interpreter.evaluate(expr, env)
+        return flatten_all(ret)
+
+class Interpreter:
+    """
+    An interpreter instance with its own, isolated global environment.
+
+    E.g.:
+        interp = Interpreter(builtins={'sqrt': math.sqrt})
+        program = interp.compile("(print (sqrt n))")
+        program.run({'n': 16})
+        program.run({'n': 25})
+    """
+    def __init__(self, builtins: Dict[str, Callable]=None, stackless: bool=False):
+        # Programs (and the modules they import) are evaluated with the
+        # stackless evaluator if requested, which isn't limited by Python's
+        # recursion limit.
+        self.evaluate = evaluate_stackless if stackless else interpret_expr
+        self.global_env = make_global_env(evaluate=self.evaluate)
+        for name, fn in (builtins or {}).items():
+            self.define(name, fn)
+
+    def define(self, name: str, value):
+        """
+        Makes `value` (e.g. a host Python function) available as `name`. Host
+        functions are passed strs rather than ropes, see host_function.
+        """
+        if callable(value) and not isinstance(value, Function):
+            value = host_function(value)
+            self.global_env[BUILTIN_NAMES][name] = value
+        self.global_env.define(name, value)
+
+    @property
+    def loader(self) -> ModuleLoader:
+        return self.global_env[LOADER]
+
+    def compile(self, source: str) -> Program:
+        """Tokenizes and parses `source` into a reusable Program."""
+        return Program(self, parser.parse_source(source))
+
+    def eval(self, source: str):
+        """
+        Evaluates `source` directly in the global environment, so definitions
+        made by it persist across subsequent calls and programs.
+        """
+        ret = None
+        for expr in self.compile(source).ast:
+            ret = self.evaluate(expr, self.global_env)
+        return flatten_all(ret)
@@ -0,0 +1,139 @@
+from typing import List, Callable
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from expr import Expr, AST_VERSION
+from env import Env
+import parser
+
+# Parsed module ASTs are cached on disk in this directory, next to the module
+# source, so that they survive across runs.
+CACHE_DIR = '__illcache__'
+
+# Parsed ASTs of every module source seen by this process, keyed by the hash of
+# the source.
+_ast_cache = {}
+
+class Module:
+    """A loaded module: its resolved path and the environment it was run in."""
+    def __init__(self, path: str, env: Env):
+        self.path = path
+        self.env = env
+
+    def __deepcopy__(self, memo):
+        # A module is loaded only once, so it's shared rather than copied.
+        return self
+
+    def __repr__(self) -> str:
+        return f"Module({self.path})"
+
+class ModuleLoader:
+    """
+    Loads modules for (import "path") expressions. Each module is run only once
+    per loader, in its own environment whose parent is `env`; subsequent
+    imports of the same file return the already loaded module.
+
+    `run` is called with the module AST and environment to evaluate the module.
+    """
+    def __init__(self, env: Env, run: Callable[[List[Expr], Env], None], base_dir: str=None):
+        self.env = env
+        self.run = run
+        # Relative paths imported from outside of any module (e.g. from the
+        # main script) are resolved relative to this directory.
+        self.base_dir = base_dir
+        self.modules = {}
+        # Paths of the modules that are currently being loaded, used to
+        # detect cyclic imports.
+        self.loading = []
+        # A (path, depth, seconds, source) tuple for each module loaded, where
+        # source is one of 'parsed', 'memory' or 'disk' indicating where the
+        # AST came from.
+        self.timings = []
+        self.lock = threading.RLock()
+
+    def resolve(self, path: str) -> str:
+        if self.loading:
+            base_dir = os.path.dirname(self.loading[-1])
+        else:
+            base_dir = self.base_dir or os.getcwd()
+        return os.path.realpath(os.path.join(base_dir, path))
+
+    def load(self, path: str) -> Module:
+        with self.lock:
+            path = self.resolve(path)
+            if path in self.modules:
+                return self.modules[path]
+            if path in self.loading:
+                cycle = self.loading[self.loading.index(path):] + [path]
+                raise ImportError("cyclic import: " + " -> ".join(cycle))
+            start = time.perf_counter()
+            self.loading.append(path)
+            try:
+                ast, source = load_ast(path)
+                env = Env(parent=self.env)
+                self.run(ast, env)
+            finally:
+                self.loading.pop()
+            module = Module(path, env)
+            self.modules[path] = module
+            self.timings.append((path, len(self.loading), time.perf_counter() - start, source))
+            return module
+
+    def report(self) -> str:
+        """Formats the import timings, one line per module."""
+        lines = ["import time:  time [us] | source | module"]
+        for path, depth, seconds, source in self.timings:
+            lines.append(f"import time: {int(seconds * 1e6):>10} | {source:>6} | {'  ' * depth}{path}")
+        return "\n".join(lines)
+
+def load_ast(path: str):
+    """
+    Returns the parsed AST of the module at `path` along with where it came
+    from. ASTs are cached both in memory and on disk, keyed by the hash of the
+    module source (and, on disk, the AST format version), so an unchanged
+    module is only ever parsed once.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _ast_cache:
+        return _ast_cache[digest], 'memory'
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    cache_path = os.path.join(cache_dir,
+            f"{os.path.basename(path)}.{digest[:16]}.v{AST_VERSION}.pickle")
+    # The cache is just an optimization, so failing to read or write it (e.g.
+    # because the directory is read-only or the AST is too deeply nested to
+    # pickle) is not an error.
+    try:
+        with open(cache_path, 'rb') as f:
+            ast = pickle.load(f)
+        source = 'disk'
+    except Exception:
+        ast = parser.parse_source(data.decode('utf-8'))
+        source = 'parsed'
+        write_cache(cache_dir, cache_path, ast)
+    _ast_cache[digest] = ast
+    return ast, source
+
+def write_cache(cache_dir: str, cache_path: str, ast: List[Expr]):
+    """
+    Pickles ast to cache_path. The pickle is written to a temporary file which
+    then replaces cache_path, so that other processes importing the same module
+    at the same time never see a partially written file.
+    """
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(ast, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -1,10 +1,29 @@
-from typing import List
+from typing import List, Generator
 from expr import *
-from token import Token, CLOSE_PAREN, OPEN_PAREN
+from tokens import Token, CLOSE_PAREN, OPEN_PAREN
+import tokenizer
+
+CLOSE_SQUARE_PAREN = Token('square-paren', 'close')
+CLOSE_BRACKET = Token('bracket', 'close')
 
 def parse(tokens: List[Token]) -> List[Expr]:
     return Parser(tokens).parse()
 
+def parse_source(source: str, line: int=1, col: int=1) -> List[Expr]:
+    """
+    Tokenizes and parses source, whose first character is at line and col of
+    the file it's from. Source without any tokens (e.g. an empty file) has no
+    expressions.
+    """
+    tokens = tokenizer.tokenize(source)
+    if not tokens:
+        return []
+    for token in tokens:
+        if token.line == 1:
+            token.col += col - 1
+        token.line += line - 1
+    return parse(tokens)
+
 ###############################################################################
 
 class Parser:
@@ -54,48 +73,110 @@ class Parser:
         """
         Parses and returns a single expression. If the expression is invalid,
         a SyntaxError is thrown.
+
+        Nothing is parsed recursively, so expressions may be nested
+        arbitrarily deep (e.g. in generated data). Vectors, maps, sets and
+        function calls whose elements are still being parsed are kept on an
+        explicit stack as PendingExpr instances. Special forms (let, if, etc)
+        are parsed by generators which yield whenever they need a
+        subexpression, and these are kept on the same stack until it's parsed.
         """
         if self.eof():
             return None
-        token = self.advance()
-        if token.type == 'paren':
-            if token.value == 'open':
-                token = self.tokens[self.pos]
-                if token.type == 'identifier':
-                    if token.value == 'let':
-                        return self.parse_let_expr()
-                    elif token.value == 'if':
-                        return self.parse_if_expr()
-                    elif token.value == 'while':
-                        return self.parse_while_expr()
-                    elif token.value == 'each':
-                        return self.parse_each_expr()
-                    elif token.value == 'fn':
-                        return self.parse_fn_def_expr()
+        stack = []
+        while True:
+            top = stack[-1] if stack else None
+            if isinstance(top, PendingExpr) and top.can_end() and self.expr_end(top.terminator):
+                # All the elements of the collection or function call on top
+                # of the stack have been parsed.
+                stack.pop()
+                if self.eof():
+                    raise top.missing_terminator(self.tokens[-1])
+                self.terminate_expr(top.terminator, top.symbol)
+                expr = top.make_expr()
+            else:
+                token = self.advance()
+                if token.type == 'paren':
+                    if token.value == 'open':
+                        if self.eof():
+                            raise syntax_error("missing ')'", token)
+                        token = self.tokens[self.pos]
+                        parse_special_form = SPECIAL_FORMS.get(token.value) \
+                                if token.type == 'identifier' else None
+                        if parse_special_form:
+                            expr = parse_special_form(self)
+                            if not isinstance(expr, Expr):
+                                # Start the generator, it's sent None.
+                                stack.append(expr)
+                                expr = None
+                        else:
+                            # Function call: (fn-identifier args...)
+                            stack.append(PendingExpr(FnCallExpr, CLOSE_PAREN, ')', token.line, token.col))
+                            continue
+                    else:
+                        raise syntax_error("unexpected )", token)
+                elif token.type == 'square-paren':
+                    if token.value == 'open':
+                        token = self.tokens[self.pos] if not self.eof() else token
+                        stack.append(PendingExpr(VectorExpr, CLOSE_SQUARE_PAREN, ']', token.line, token.col))
+                        continue
                     else:
-                        return self.parse_fn_call_expr()
+                        raise syntax_error("unexpected ]", token)
+                elif token.type == 'bracket':
+                    if token.value == 'open':
+                        token = self.tokens[self.pos] if not self.eof() else token
+                        stack.append(PendingExpr(MapExpr, CLOSE_BRACKET, '}', token.line, token.col))
+                        continue
+                    else:
+                        raise syntax_error("unexpected }", token)
+                elif token.type == 'set-bracket':
+                    token = self.tokens[self.pos] if not self.eof() else token
+                    stack.append(PendingExpr(SetExpr, CLOSE_BRACKET, '}', token.line, token.col))
+                    continue
+                elif token.type in ('string', 'number', 'bool'):
+                    expr = AtomExpr(token.value, token.line, token.col)
                 else:
-                    return self.parse_fn_call_expr()
-            else:
-                raise syntax_error("unexpected )", token)
-        elif token.type == 'square-paren':
-            if token.value == 'open':
-                return self.parse_vector_expr()
-            else:
-                raise syntax_error("unexpected ]", token)
-        elif token.type == 'bracket':
-            if token.value == 'open':
-                return self.parse_map_expr()
-            else:
-                raise syntax_error("unexpected }", token)
-        elif token.type in ('string', 'number', 'bool'):
-            return AtomExpr(token.value, token.line, token.col)
+                    expr = RefExpr(token.value, token.line, token.col)
+
+            # Hand the parsed expression to whatever is waiting for it. A
+            # special form that is done returns its own expression, which is
+            # in turn handed to the frame below it.
+            while True:
+                if not stack:
+                    return expr
+                top = stack[-1]
+                if isinstance(top, PendingExpr):
+                    self.add_to_pending(top, expr)
+                    break
+                try:
+                    top.send(expr)
+                    break
+                except StopIteration as e:
+                    stack.pop()
+                    expr = e.value
+
+    def add_to_pending(self, pending: 'PendingExpr', expr: Expr):
+        """Adds a parsed element to a collection or function call."""
+        if pending.type is not MapExpr:
+            pending.exprs.append(expr)
+        elif pending.key is None:
+            # Map key: must be followed by a colon and a value.
+            key = expr
+            if self.expr_end(CLOSE_BRACKET):
+                raise syntax_error("map key must have a colon and a value", key)
+            if not self.tokens[self.pos] == Token('colon', ':'):
+                raise syntax_error("no colon between key and value in map", key)
+            self.advance()
+            if self.expr_end(CLOSE_BRACKET):
+                raise syntax_error("map key must have a value", key)
+            pending.key = key
         else:
-            return RefExpr(token.value, token.line, token.col)
+            pending.expr_dict[pending.key] = expr
+            pending.key = None
 
 ###############################################################################
     
-    def parse_let_expr(self) -> LetExpr:
+    def parse_let_expr(self) -> Generator[None, Expr, LetExpr]:
         """Variable binding: (let name expr)"""
         # Consume 'let' keyword.
         keywd = self.advance()
@@ -106,47 +187,47 @@ class Parser:
             raise syntax_error("variable name must be a valid identifier", name)
         if self.expr_end():
             raise syntax_error("let expression must have a value", keywd)
-        value = self.parse_expr()
+        value = yield
         # Make sure let expression is properly terminated.
         self.terminate_expr()
         return LetExpr(name.value, value, keywd.line, keywd.col)
 
-    def parse_if_expr(self) -> IfExpr:
+    def parse_if_expr(self) -> Generator[None, Expr, IfExpr]:
         """If "expression": (if cond-expr true-branch-expr false-branch-expr)"""
         # Consume 'if' keyword.
         keywd = self.advance()
         if self.expr_end():
             raise syntax_error("if expression must have a condition and at least a true branch", keywd)
-        cond = self.parse_expr()
+        cond = yield
         if self.expr_end():
             raise syntax_error("if expression must have a true branch", keywd)
         elif not can_eval_to_bool(cond):
             raise syntax_error("if expression condition must evaluate to a boolean value", cond)
-        true_branch = self.parse_expr()
+        true_branch = yield
         false_branch = None
         # A false (else) branch is optional so only parse it if the next token is
         # not a closing paren.
         if self.tokens[self.pos] != CLOSE_PAREN:
-            false_branch = self.parse_expr()
+            false_branch = yield
         # Make sure the if expression is terminated.
         self.terminate_expr()
         return IfExpr(cond, true_branch, false_branch, keywd.line, keywd.col)
 
-    def parse_while_expr(self) -> WhileExpr:
+    def parse_while_expr(self) -> Generator[None, Expr, WhileExpr]:
         # Consume 'while' keyword.
         keywd = self.advance()
         if self.expr_end():
             raise syntax_error("while expression must have a condition and a body", keywd)
-        cond = self.parse_expr()
+        cond = yield
         if self.expr_end():
             raise syntax_error("while expression must have a body", keywd)
         elif not can_eval_to_bool(cond):
             raise syntax_error("while expression condition must evaluate to a boolean value", cond)
-        body = self.parse_expr()
+        body = yield
         self.terminate_expr()
         return WhileExpr(cond, body, keywd.line, keywd.col)
 
-    def parse_each_expr(self) -> EachExpr:
+    def parse_each_expr(self) -> Generator[None, Expr, EachExpr]:
         # Consume 'each' keyword.
         keywd = self.advance()
         if self.expr_end():
@@ -158,7 +239,7 @@ class Parser:
             raise syntax_error("each expression must have a non empty iteration header", open_paren)
         elif self.expr_end():
             raise syntax_error("each expression must have a non empty iteration header", open_paren)
-        collection = self.parse_expr()
+        collection = yield
         if not isinstance(collection, (CollectionExpr, RefExpr, FnCallExpr)):
             raise syntax_error("first element of an each expression iteration header must be a collection", open_paren)
         elif self.expr_end():
@@ -166,7 +247,7 @@ class Parser:
         element = self.advance()
         if not element.type == 'identifier':
             raise syntax_error("the second element of an each expression iteration header must be valid identifier denoting the current element in the iteration", element)
-        if self.expr_end():
+        if self.eof():
             raise syntax_error("incomplete each expression", element)
         element = element.value
         # The collection may be a map in which case another identifier for each
@@ -179,12 +260,12 @@ class Parser:
         # Each body
         if self.expr_end():
             raise syntax_error("each expression must have a body", keywd)
-        body = self.parse_expr()
+        body = yield
         # Consume closing paren.
         self.terminate_expr()
         return EachExpr(collection, element, body, keywd.line, keywd.col)
 
-    def parse_fn_def_expr(self) -> FnDefExpr:
+    def parse_fn_def_expr(self) -> Generator[None, Expr, FnDefExpr]:
         """
         Function definition:
             (fn identifier (params...) expr) or
@@ -221,50 +302,23 @@ class Parser:
         # Function body
         if self.expr_end():
             raise syntax_error("function must have a function body", keywd)
-        body = self.parse_expr()
+        body = yield
 
         # Make sure the function definition is terminated.
         self.terminate_expr()
         return FnDefExpr(name.value, params, body, keywd.line, keywd.col)
 
-    def parse_fn_call_expr(self) -> FnCallExpr:
-        """Function call: (fn-identifier args...)"""
-        line, col = self.tokens[self.pos].line, self.tokens[self.pos].col
-        fn_expr = self.parse_expr()
-        args = []
-        while not self.expr_end():
-            args.append(self.parse_expr())
-        if self.eof():
-            raise syntax_error("missing ')'", Token(None, None, line, col))
-        # Make sure the function call expression is terminated.
+    def parse_import_expr(self) -> ImportExpr:
+        """Module import: (import "path")"""
+        # Consume 'import' keyword.
+        keywd = self.advance()
+        if self.expr_end():
+            raise syntax_error("import expression must have a module path", keywd)
+        path = self.advance()
+        if path.type != 'string':
+            raise syntax_error("module path must be a string", path)
         self.terminate_expr()
-        return FnCallExpr(fn_expr, args, line, col)
-
-    def parse_vector_expr(self) -> VectorExpr:
-        exprs = []
-        line, col = self.tokens[self.pos].line, self.tokens[self.pos].col
-        CLOSE_SQUARE_PAREN = Token('square-paren', 'close')
-        while not self.expr_end(CLOSE_SQUARE_PAREN):
-            exprs.append(self.parse_expr())
-        self.terminate_expr(CLOSE_SQUARE_PAREN, ']')
-        return VectorExpr(exprs, line, col)
-
-    def parse_map_expr(self) -> MapExpr:
-        exprs = {}
-        line, col = self.tokens[self.pos].line, self.tokens[self.pos].col
-        CLOSE_BRACKET = Token('bracket', 'close')
-        while not self.expr_end(CLOSE_BRACKET):
-            key = self.parse_expr()
-            if self.expr_end(CLOSE_BRACKET):
-                raise syntax_error("map key must have a colon and a value", key)
-            if not self.tokens[self.pos] == Token('colon', ':'):
-                raise syntax_error("no colon between key and value in map", key)
-            self.advance()
-            if self.expr_end(CLOSE_BRACKET):
-                raise syntax_error("map key must have a value", key)
-            exprs[key] = self.parse_expr()
-        self.terminate_expr(CLOSE_BRACKET, '}')
-        return MapExpr(exprs, line, col)
+        return ImportExpr(path.value, keywd.line, keywd.col)
 
     ###############################################################################
 
@@ -286,6 +340,54 @@ class Parser:
             raise syntax_error(f"missing '{symbol}'", self.tokens[self.pos])
         self.pos += 1
 
+# Parsers of the special forms, by keyword.
+SPECIAL_FORMS = {
+    'let': Parser.parse_let_expr,
+    'if': Parser.parse_if_expr,
+    'while': Parser.parse_while_expr,
+    'each': Parser.parse_each_expr,
+    'fn': Parser.parse_fn_def_expr,
+    'import': Parser.parse_import_expr,
+}
+
+class PendingExpr:
+    """
+    A vector, map, set or function call whose elements are still being parsed.
+    For maps, key holds the parsed key whose value is yet to be parsed.
+    """
+    __slots__ = ('type', 'terminator', 'symbol', 'line', 'col', 'exprs', 'expr_dict', 'key')
+
+    def __init__(self, type, terminator: Token, symbol: str, line: int, col: int):
+        self.type = type
+        self.terminator = terminator
+        self.symbol = symbol
+        self.line = line
+        self.col = col
+        self.exprs = []
+        self.expr_dict = {}
+        self.key = None
+
+    def can_end(self) -> bool:
+        # A function call must have at least the function expression, and a
+        # map must not end between a key and its value.
+        if self.type is FnCallExpr:
+            return len(self.exprs) > 0
+        return self.key is None
+
+    def missing_terminator(self, last_token: Token) -> SyntaxError:
+        if self.type is FnCallExpr:
+            return syntax_error("missing ')'", Token(None, None, self.line, self.col))
+        return syntax_error(f"missing '{self.symbol}'", last_token)
+
+    def make_expr(self) -> Expr:
+        if self.type is FnCallExpr:
+            return FnCallExpr(self.exprs[0], self.exprs[1:], self.line, self.col)
+        elif self.type is VectorExpr:
+            return VectorExpr(self.exprs, self.line, self.col)
+        elif self.type is SetExpr:
+            return SetExpr(self.exprs, self.line, self.col)
+        return MapExpr(self.expr_dict, self.line, self.col)
+
 def can_eval_to_bool(expr: Expr) -> bool:
     return isinstance(expr, (AtomExpr, FnCallExpr, LetExpr, RefExpr))
 
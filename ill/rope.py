@@ -0,0 +1,137 @@
+import threading
+
+# Guards appending to chunk lists shared between ropes.
+_append_lock = threading.Lock()
+
+class Rope:
+    """
+    An immutable string built out of chunks which makes repeated concatenation
+    cheap.
+
+    Appending to a rope doesn't copy the string built so far, it appends the
+    new piece to a chunk list that is shared with the rope being appended to.
+    Each rope only sees the first `count` chunks of the list, so the original
+    rope is left unchanged. Should an older rope be appended to again, it gets
+    its own copy of the chunk list. This makes the common case of
+        (let s (+ s piece))
+    in a loop amortized O(len(piece)) rather than O(len(s)).
+
+    The chunks are only joined into a flat str (and then cached) when the
+    string is actually needed: printing, comparing, hashing or indexing.
+    """
+    __slots__ = ('chunks', 'count', 'length', 'flat')
+
+    def __init__(self, s: str=''):
+        self.chunks = [s] if s else []
+        self.count = len(self.chunks)
+        self.length = len(s)
+        self.flat = s
+
+    def append(self, piece) -> 'Rope':
+        """Returns a new rope which is this rope followed by `piece`."""
+        if isinstance(piece, Rope):
+            piece = str(piece)
+        elif not isinstance(piece, str):
+            raise TypeError(f"can only concatenate strings, not {type(piece).__name__}")
+        # Checking whether the shared chunk list can be appended to and doing
+        # so must be atomic, or two threads appending to the same rope could
+        # both append to the list.
+        with _append_lock:
+            chunks = self.chunks
+            if len(chunks) != self.count:
+                # Another rope has already been appended to this one and it
+                # owns the tail of the shared chunk list.
+                chunks = chunks[:self.count]
+            chunks.append(piece)
+        rope = Rope.__new__(Rope)
+        rope.chunks = chunks
+        rope.count = len(chunks)
+        rope.length = self.length + len(piece)
+        rope.flat = None
+        return rope
+
+    def __add__(self, other) -> 'Rope':
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return self.append(other)
+
+    def __radd__(self, other) -> 'Rope':
+        if not isinstance(other, str):
+            return NotImplemented
+        return Rope(other).append(self)
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            self.flat = ''.join(self.chunks[:self.count])
+        return self.flat
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __contains__(self, s) -> bool:
+        return flatten(s) in str(self)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return len(self) == len(other) and str(self) == str(other)
+
+    def __ne__(self, other) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __lt__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return str(self) < str(other)
+
+    def __le__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return str(self) <= str(other)
+
+    def __gt__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return str(self) > str(other)
+
+    def __ge__(self, other) -> bool:
+        if not isinstance(other, (str, Rope)):
+            return NotImplemented
+        return str(self) >= str(other)
+
+def flatten(value):
+    """Returns `value` as a flat str if it's a rope, otherwise unchanged."""
+    return str(value) if isinstance(value, Rope) else value
+
+def flatten_all(value):
+    """
+    Returns `value` with every rope in it, including those in vectors, maps and
+    sets, flattened to a str. Collections without any ropes in them are
+    returned as is rather than copied.
+    """
+    if isinstance(value, Rope):
+        return str(value)
+    elif isinstance(value, list):
+        items = [flatten_all(item) for item in value]
+        return value if all(a is b for a, b in zip(items, value)) else items
+    elif isinstance(value, dict):
+        items = [(flatten_all(k), flatten_all(v)) for k, v in value.items()]
+        unchanged = all(k is k2 and v is v2 for (k, v), (k2, v2) in zip(value.items(), items))
+        return value if unchanged else dict(items)
+    elif isinstance(value, frozenset):
+        items = [flatten_all(item) for item in value]
+        return value if all(a is b for a, b in zip(items, value)) else frozenset(items)
+    return value
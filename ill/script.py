@@ -0,0 +1,82 @@
+from typing import List
+import os
+import sys
+import parser
+import image
+from expr import Expr
+from interpreter import Interpreter, format_error
+
+# Exit codes of ill.py, the same whether a script is run on its own, in batch
+# mode or in watch mode.
+OK = 0
+TOKENIZE_ERROR = 1
+PARSE_ERROR = 2
+IMAGE_ERROR = 3
+RUNTIME_ERROR = 4
+FILE_ERROR = 5
+
+class ScriptError(Exception):
+    """An error that prevents a script from running, with its exit code."""
+    def __init__(self, message, exit_code: int):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+def read_source(path: str) -> str:
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise ScriptError(e, FILE_ERROR)
+
+def parse_source(source: str) -> List[Expr]:
+    try:
+        return parser.parse_source(source)
+    except TypeError as e:
+        # Only the tokenizer raises TypeErrors.
+        raise ScriptError(e, TOKENIZE_ERROR)
+    except SyntaxError as e:
+        raise ScriptError(e, PARSE_ERROR)
+
+def make_interpreter(path: str, image_path: str=None, stackless: bool=False) -> Interpreter:
+    """
+    Returns a fresh interpreter for running the script at path, restored from
+    the image at image_path if given.
+    """
+    interp = Interpreter(stackless=stackless)
+    if image_path:
+        try:
+            image.load_image(interp.global_env, image_path)
+        except (OSError, image.ImageError) as e:
+            raise ScriptError(e, IMAGE_ERROR)
+    # Imports in the script are relative to the script itself.
+    interp.loader.base_dir = os.path.dirname(os.path.abspath(path))
+    return interp
+
+def run_file(path: str, image_path: str=None, stackless: bool=False,
+        save_image_path: str=None, import_time: bool=False) -> int:
+    """
+    Runs the script at path in a fresh interpreter, printing any error, and
+    returns its exit code.
+    """
+    try:
+        ast = parse_source(read_source(path))
+        interp = make_interpreter(path, image_path, stackless)
+    except ScriptError as e:
+        print("ERROR:", e)
+        return e.exit_code
+    try:
+        for expr in ast:
+            interp.evaluate(expr, interp.global_env)
+    except Exception as e:
+        print("ERROR:", format_error(e))
+        return RUNTIME_ERROR
+    finally:
+        if import_time:
+            print(interp.loader.report(), file=sys.stderr)
+    if save_image_path:
+        try:
+            image.save_image(interp.global_env, save_image_path)
+        except (OSError, image.ImageError) as e:
+            print("ERROR:", e)
+            return IMAGE_ERROR
+    return OK
@@ -1,12 +1,12 @@
 from typing import List
-from token import Token
+from tokens import Token
 import re
 
 WHITESPACE_RE = re.compile('\s+')
 DIGIT_RE = re.compile('[0-9]')
 FLOAT_RE = re.compile('(0|[1-9][0-9]*)\.[0-9]+')
 IDENTIFIER_RE1 = re.compile('[a-z_]')
-IDENTIFIER_RE2 = re.compile('[a-z_\-0-9]')
+IDENTIFIER_RE2 = re.compile('[a-z_\-0-9?]')
 ARITHMETIC_RE = re.compile('[+\-\*/]')
 OPERATOR_RE = re.compile('[=<>]')
 
@@ -26,11 +26,12 @@ def tokenize(source: str) -> List[Token]:
         - paren: ( )
         - square-paren: [ ]
         - bracket: { }
+        - set-bracket: #{ (closed by a regular bracket)
         - colon: :
         - number: 0|[1-9][0-9]*(.[0-9]+)* # TODO add float support
         - string: anything enclosed in double quotes, including escaped double quotes (\") 
         - bool: true false
-        - identifier: [a-z_][a-z_0-9]*
+        - identifier: [a-z_][a-z_\-0-9?]*
         - arithmetic: + - * /
         - operator: = < <= > >= (negation is done with the not keyword)
         - comment: ;anything here
@@ -64,6 +65,10 @@ def tokenize(source: str) -> List[Token]:
             tokens.append(Token('bracket', 'open', line, col))
         elif char == '}':
             tokens.append(Token('bracket', 'close', line, col))
+        elif char == '#' and i < len(source) - 1 and source[i+1] == '{':
+            tokens.append(Token('set-bracket', 'open', line, col))
+            i += 1
+            col += 1
         elif char == ':':
             tokens.append(Token('colon', ':', line, col))
         elif WHITESPACE_RE.search(char):
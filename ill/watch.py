@@ -0,0 +1,290 @@
+from typing import List, Tuple
+import contextlib
+import copy
+import hashlib
+import io
+import os
+import sys
+import time
+import parser
+from expr import Expr
+import script
+from interpreter import format_error, copy_value
+import image
+
+OPENERS = '([{'
+CLOSERS = ')]}'
+
+class Form:
+    """
+    A top-level form of a source file: its text and the (1-based) line and
+    column of its first character.
+    """
+    def __init__(self, text: str, line: int, col: int):
+        self.text = text
+        self.line = line
+        self.col = col
+        self.hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def split_forms(source: str) -> List[Form]:
+    """
+    Splits source into its top-level forms by matching parens, brackets and
+    string quotes, without tokenizing it. A form that isn't valid ILL (or is
+    several expressions, e.g. an atom directly followed by a call) is left for
+    the parser to deal with.
+    """
+    forms = []
+    i = 0
+    line = 1
+    line_start = 0
+    while i < len(source):
+        if source[i].isspace():
+            if source[i] == '\n':
+                line += 1
+                line_start = i + 1
+            i += 1
+            continue
+        start = i
+        start_line = line
+        # Mirror the tokenizer, which starts counting columns from 2 on every
+        # line but the first.
+        start_col = i - line_start + (1 if line == 1 else 2)
+        depth = 0
+        in_string = False
+        while i < len(source):
+            char = source[i]
+            if in_string:
+                if char == '"' and source[i-1] != '\\':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in OPENERS:
+                depth += 1
+            elif char in CLOSERS:
+                depth -= 1
+            elif depth == 0 and char.isspace():
+                break
+            if char == '\n':
+                line += 1
+                line_start = i + 1
+            i += 1
+            # The form ends once its outermost collection or string is closed.
+            if depth <= 0 and not in_string and (char in CLOSERS or char == '"'):
+                break
+        forms.append(Form(source[start:i], start_line, start_col))
+    return forms
+
+def parse_form(form: Form):
+    """
+    Tokenizes and parses a single form, returning its expressions (none if the
+    form has no tokens).
+    """
+    return parser.parse_source(form.text, form.line, form.col)
+
+def sub_exprs(expr: Expr):
+    """Yields the expressions directly contained in expr."""
+    for value in vars(expr).values():
+        if isinstance(value, Expr):
+            yield value
+        elif isinstance(value, list):
+            yield from (e for e in value if isinstance(e, Expr))
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                yield from (e for e in (k, v) if isinstance(e, Expr))
+
+def move_exprs(exprs: List[Expr], lines: int, cols: int, first_line: int) -> List[Expr]:
+    """
+    Returns a copy of the expressions of a form that started on first_line,
+    with their positions moved down by `lines` and, on the first line of the
+    form, right by `cols`, as if the form had been parsed at its new position.
+    """
+    # The moved copy of each expression, by id of the original.
+    copies = {}
+    stack = list(exprs)
+    while stack:
+        expr = stack.pop()
+        if id(expr) in copies:
+            continue
+        moved = copy.copy(expr)
+        if moved.line is not None:
+            if moved.line == first_line:
+                moved.col += cols
+            moved.line += lines
+        copies[id(expr)] = moved
+        stack.extend(sub_exprs(expr))
+    def copy_of(value):
+        return copies[id(value)] if isinstance(value, Expr) else value
+    for moved in copies.values():
+        for name, value in vars(moved).items():
+            if isinstance(value, Expr):
+                setattr(moved, name, copy_of(value))
+            elif isinstance(value, list):
+                setattr(moved, name, [copy_of(v) for v in value])
+            elif isinstance(value, dict):
+                setattr(moved, name, {copy_of(k): copy_of(v) for k, v in value.items()})
+    return [copies[id(expr)] for expr in exprs]
+
+def source_hash(path: str) -> str:
+    """Returns the hash of the file at path, or None if it can't be read."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class Watcher:
+    """
+    Reruns a source file whenever it changes, doing as little work as
+    possible: only forms whose text changed are tokenized and parsed again,
+    and execution resumes at the first changed form from a snapshot of the
+    global environment, so that the unchanged forms above it (e.g. function
+    definitions) aren't run again. Modules imported by the file are watched
+    too, and a change to one reruns the file from the form that imported it.
+
+    Snapshots are deep copies, so rather than taking one before every form
+    (which would copy all the script's data after every form) one is taken
+    only once the forms run since the last snapshot took at least as long as
+    taking it did. Snapshots thus never take longer than running the script,
+    and resuming from the last snapshot before the first changed form replays
+    at most about as much as one snapshot costs.
+    """
+    def __init__(self, path: str, image_path: str=None, stackless: bool=False):
+        self.path = path
+        self.interp = script.make_interpreter(path, image_path, stackless)
+        self.forms = []
+        # The parsed expressions of the current forms, by form hash and
+        # position.
+        self.asts = {}
+        # (i, snapshot) pairs, in order of i, where snapshot is the global
+        # environment as it was before running the ith form.
+        self.snapshots = []
+        self.snapshot_seconds = 0.0
+        self.take_snapshot(0)
+        # The index of the form that loaded each module imported by the file,
+        # and the hash of the module's source at the time, by module path.
+        self.module_forms = {}
+
+    def take_snapshot(self, i: int):
+        start = time.perf_counter()
+        self.snapshots.append((i, self.snapshot()))
+        self.snapshot_seconds = time.perf_counter() - start
+
+    def snapshot(self) -> Tuple[dict, dict]:
+        """
+        Returns a copy of the global environment's symbol table and of the
+        loaded modules. Functions, modules and other immutable values are
+        shared with the copy rather than copied.
+        """
+        # The module loader and builtins are not part of the program's state.
+        sym_table = image.program_symbols(self.interp.global_env)
+        return copy_value(sym_table), dict(self.interp.loader.modules)
+
+    def restore(self, snapshot: Tuple[dict, dict]):
+        sym_table, modules = snapshot
+        env = self.interp.global_env
+        restored = dict(image.builtins_of(env))
+        restored.update((name, env.sym_table[name]) for name in image.RESERVED_NAMES
+                if name in env.sym_table)
+        restored.update(copy_value(sym_table))
+        env.sym_table = restored
+        # Modules loaded since the snapshot are loaded again, from their
+        # current source, when they are next imported.
+        self.interp.loader.modules = dict(modules)
+        self.module_forms = {path: v for path, v in self.module_forms.items() if path in modules}
+
+    def update(self) -> bool:
+        """
+        Reruns the file from its first changed form, if any. Returns whether
+        anything was run.
+        """
+        start = time.perf_counter()
+        try:
+            forms = split_forms(script.read_source(self.path))
+        except script.ScriptError as e:
+            print("ERROR:", e)
+            return True
+        first = 0
+        while first < min(len(forms), len(self.forms)) and forms[first].hash == self.forms[first].hash:
+            first += 1
+        # A changed module is run again by rerunning the form importing it.
+        changed_modules = [i for path, (i, digest) in self.module_forms.items()
+                if source_hash(path) != digest]
+        first = min([first] + changed_modules)
+        if first == len(forms) == len(self.forms):
+            return False
+
+        # Forms that didn't change reuse their parsed expressions, which are
+        # moved to the form's new position if it moved.
+        asts = {}
+        parsed = 0
+        by_hash = {key[0]: (key, exprs) for key, exprs in self.asts.items()}
+        for form in forms:
+            key = (form.hash, form.line, form.col)
+            if key in self.asts:
+                asts[key] = self.asts[key]
+                continue
+            if form.hash in by_hash:
+                (_, line, col), exprs = by_hash[form.hash]
+                asts[key] = move_exprs(exprs, form.line - line, form.col - col, line)
+                continue
+            try:
+                asts[key] = parse_form(form)
+            except (TypeError, SyntaxError) as e:
+                print("ERROR:", e)
+                return True
+            parsed += 1
+        self.asts = asts
+
+        while self.snapshots[-1][0] > first:
+            self.snapshots.pop()
+        resume, snapshot = self.snapshots[-1]
+        self.restore(snapshot)
+        self.forms = forms[:resume]
+        # Seconds spent running forms since the last snapshot.
+        unsaved = 0.0
+        for i in range(resume, len(forms)):
+            form = forms[i]
+            form_start = time.perf_counter()
+            try:
+                # The unchanged forms between the snapshot and the first
+                # changed one are replayed silently, as their output has
+                # already been printed.
+                output = contextlib.redirect_stdout(io.StringIO()) if i < first \
+                        else contextlib.nullcontext()
+                with output:
+                    for expr in asts[(form.hash, form.line, form.col)]:
+                        self.interp.evaluate(expr, self.interp.global_env)
+            except Exception as e:
+                print("ERROR:", format_error(e))
+                break
+            self.forms.append(form)
+            for path in self.interp.loader.modules:
+                if path not in self.module_forms:
+                    self.module_forms[path] = (i, source_hash(path))
+            unsaved += time.perf_counter() - form_start
+            if unsaved >= self.snapshot_seconds:
+                self.take_snapshot(i + 1)
+                unsaved = 0.0
+        print(f"--- ran forms {first+1}-{len(forms)} of {len(forms)} ({parsed} parsed, "
+              f"{first - resume} replayed) in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+        return True
+
+    def watch(self, interval: float=0.2):
+        """
+        Runs the file and then reruns it whenever it or a module it imports is
+        modified.
+        """
+        mtimes = None
+        while True:
+            current = [mtime(path) for path in [self.path, *self.module_forms]]
+            if current[0] is not None and current != mtimes:
+                mtimes = current
+                self.update()
+                sys.stdout.flush()
+            time.sleep(interval)